@@ -3,17 +3,82 @@ use it like
 python calibrate_camera.py /home/fari/Pictures/calibrationcheckerboard/calibration jpg /home/fari/Pictures/calibrationcheckerboard/ref_plan.jpg 25 10 7 ./calibration.yml 
 """
 import argparse
+import functools
 import numpy as np
 import cv2
-import glob
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Extensions of the images picked up by batch_preprocess_images
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff')
 
 # termination criteria
 criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
 
-def calibrate(dirpath, image_format, width, height):
+# ArUco dictionary and detector reused across calls, the detector keeps its parameters between frames
+_ARUCO_DICT = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_50)
+_ARUCO_DETECTOR = cv2.aruco.ArucoDetector(_ARUCO_DICT, cv2.aruco.DetectorParameters())
+
+
+def _read_gray(fname):
+    """ Decode an image file straight to grayscale, returns None if it cannot be read. """
+    return cv2.imread(fname, cv2.IMREAD_GRAYSCALE)
+
+
+@functools.lru_cache(maxsize=8)
+def _make_objp(width, height, square_size=1, dim=3):
+    """
+    Chessboard corner positions, in the order given by findChessboardCorners.
+    The array is cached and shared between callers, so it is read-only.
+    """
+    objp = np.zeros((height*width, dim), np.float32)
+    # x varies fastest, like np.mgrid[0:width, 0:height].T.reshape(-1, 2)
+    objp[:, :2] = np.indices((height, width))[::-1].reshape(2, -1).T * square_size
+    objp.setflags(write=False)
+    return objp
+
+
+def _detect_one(fname, pattern, sb=False):
+    """
+    Find the chessboard corners in one calibration image.
+    
+    Parameters:
+    - fname (str): Path to the image.
+    - pattern (tuple): Number of inner corners of the chessboard (width, height).
+    - sb (bool): Use findChessboardCornersSB instead of findChessboardCorners + cornerSubPix.
+    
+    Returns:
+    - corners (numpy.ndarray): Sub-pixel corners, None if the chessboard is not found.
+    - size (tuple): Size (width, height) of the image, None if it cannot be read.
+    """
+    gray = _read_gray(fname)
+    if gray is None:
+        return None, None
+    size = gray.shape[::-1]
+
+    if sb:
+        # Detect and refine the corners to sub-pixel accuracy in a single pass
+        ret, corners = cv2.findChessboardCornersSB(gray, pattern, flags=cv2.CALIB_CB_EXHAUSTIVE | cv2.CALIB_CB_ACCURACY)
+        return (corners if ret else None), size
+
+    # Find the chess board corners on a downscaled copy, the search is the costly part
+    h, w = gray.shape
+    scale = max(1, max(h, w) // 1000)
+    small = cv2.resize(gray, (w // scale, h // scale), interpolation=cv2.INTER_AREA) if scale > 1 else gray
+    ret, corners = cv2.findChessboardCorners(small, pattern, None)
+    if not ret:
+        return None, size
+
+    # Refine them at full resolution
+    corners = (corners + 0.5) * scale - 0.5
+    # Size the refinement window from the spacing between neighbouring corners
+    spacing = np.linalg.norm(np.diff(corners.reshape(-1, pattern[0], 2), axis=1), axis=2).mean()
+    win = max(5, int(spacing / 4))
+    corners = cv2.cornerSubPix(gray, corners, (win, win), (-1, -1), criteria)
+    return corners, size
+
+
+def calibrate(dirpath, image_format, width, height, sb=False, draw=False, flags=cv2.CALIB_USE_LU):
     """
     Apply camera calibration operation for images in the given directory path.
     
@@ -24,6 +89,10 @@ def calibrate(dirpath, image_format, width, height):
     - ref_plan_path (str): Path to the reference plan image.
     - width (int): Number of inner corners of the chessboard along its width.
     - height (int): Number of inner corners of the chessboard along its height.
+    - sb (bool): Use findChessboardCornersSB, slower but more robust on hard images.
+    - draw (bool): Display the detected corners on each image.
+    - flags (int): Flags for cv2.calibrateCamera. The default solves with LU instead of SVD; add
+      cv2.CALIB_FIX_K3 and cv2.CALIB_ZERO_TANGENT_DIST for simple lenses to estimate fewer parameters.
     
     Returns:
     - ret (float): Root mean square (RMS) re-projection error.
@@ -33,41 +102,42 @@ def calibrate(dirpath, image_format, width, height):
     - tvecs (list of numpy.ndarray): Translation vectors for each image used in calibration.
     """
     
-    # prepare object points, like (0,0,0), (1,0,0), (2,0,0) ....,(8,6,0)
-    objp = np.zeros((height*width, 3), np.float32)
-    objp[:, :2] = np.mgrid[0:width, 0:height].T.reshape(-1, 2)
-    objp = objp 
-
-    # Arrays to store object points and image points from all the images.
-    objpoints = []  # 3d point in real world space
-    imgpoints = []  # 2d points in image plane.
+    # prepare object points, like (0,0,0), (1,0,0), (2,0,0) ....,(8,6,0), shared by every view
+    objp = _make_objp(width, height)
 
-    if dirpath[-1:] == '/':
-        dirpath = dirpath[:-1]
+    with os.scandir(dirpath) as entries:
+        suffix = '.' + image_format
+        images = [entry.path for entry in entries if entry.name.endswith(suffix) and entry.is_file()]
 
-    images = glob.glob(dirpath+'/' + '*.' + image_format)
-    for fname in images:
-        img = cv2.imread(fname)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    # The views are independent and OpenCV releases the GIL, so detect the corners of all of them in parallel
+    with ThreadPoolExecutor() as executor:
+        results = list(executor.map(functools.partial(_detect_one, pattern=(width, height), sb=sb), images))
 
-        # Find the chess board corners
-        ret, corners = cv2.findChessboardCorners(gray, (width, height), None)
-
-        # If found, add object points, image points (after refining them)
-        if ret:
-            objpoints.append(objp)
-            corners2 = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
-            imgpoints.append(corners2)
+    imgpoints = []  # 2d points in image plane.
+    for fname, (corners, size) in zip(images, results):
+        if corners is None:
+            continue
+        imgpoints.append(corners)
+        image_size = size
 
+        if draw:
             # Draw and display the corners
-            img = cv2.drawChessboardCorners(img, (width, height), corners2, ret)
+            img = cv2.drawChessboardCorners(cv2.imread(fname), (width, height), corners, True)
+            cv2.imshow('img', img)
+            cv2.waitKey(500)
+    if draw:
+        cv2.destroyAllWindows()
+
+    if not imgpoints:
+        raise ValueError("Checkerboard not found in any calibration image.")
 
-    ret, mtx, dist, rvecs, tvecs = cv2.calibrateCamera(objpoints, imgpoints, gray.shape[::-1], None, None)
+    objpoints = [objp] * len(imgpoints)  # 3d point in real world space
+    ret, mtx, dist, rvecs, tvecs = cv2.calibrateCamera(objpoints, imgpoints, image_size, None, None, flags=flags)
     
     return ret, mtx, dist, rvecs, tvecs
 
 
-def find_homography_from_checkerboad(ref_plan, mtx, dist, width, height, square_size):
+def find_homography_from_checkerboad(ref_plan, mtx, dist, width, height, square_size, undistort_maps=None):
     """
     Find the homography matrix for a given reference checkerboard image.
     
@@ -75,6 +145,7 @@ def find_homography_from_checkerboad(ref_plan, mtx, dist, width, height, square_
     - ref_plan (str or numpy.ndarray): Path to the reference checkerboard image or the image itself.
     - width (int): Number of inner corners of the checkerboard along its width.
     - height (int): Number of inner corners of the checkerboard along its height.
+    - undistort_maps (tuple): Maps from make_undistort_maps, built for this image if not given.
     
     Returns:
     - homography (numpy.ndarray): Homography matrix.
@@ -83,19 +154,18 @@ def find_homography_from_checkerboad(ref_plan, mtx, dist, width, height, square_
     
     # If the input is a string (path), read the image
     if isinstance(ref_plan, str):
-        ref_plan = cv2.imread(ref_plan)
-    ref_plan = undistort_image(ref_plan, mtx, dist)
-    gray = cv2.cvtColor(ref_plan, cv2.COLOR_BGR2GRAY)
+        ref_plan = cv2.imread(ref_plan, cv2.IMREAD_GRAYSCALE)
+    elif ref_plan.ndim == 3:
+        ref_plan = cv2.cvtColor(ref_plan, cv2.COLOR_BGR2GRAY)
+    gray = undistort_image(ref_plan, mtx, dist, undistort_maps)
     ret, corners = cv2.findChessboardCorners(gray, (width, height), None)
     
     if not ret:
         raise ValueError("Checkerboard not found in the provided image.")
     
     # Define the points for the perfect grid in standard coordinates
-    objp = np.zeros((height*width, 2), np.float32)
-    objp[:, :2] = np.mgrid[0:width, 0:height].T.reshape(-1, 2)*square_size
     # Translate the object points by (25, 25) to shift the origin to the upper right corner of the calibration checkerboard 
-    objp += np.array([25, 25], dtype=np.float32)
+    objp = _make_objp(width, height, square_size, dim=2) + np.array([25, 25], dtype=np.float32)
     # Compute the homography matrix
     homography, status = cv2.findHomography(corners, objp)
     
@@ -103,8 +173,15 @@ def find_homography_from_checkerboad(ref_plan, mtx, dist, width, height, square_
 
 
 def save_coefficients(mtx, dist, H, path):
-    """ Save the camera matrix, distortion coefficients and perspective matrix to given path/file. """
-    cv_file = cv2.FileStorage(path, cv2.FILE_STORAGE_WRITE)
+    """
+    Save the camera matrix, distortion coefficients and perspective matrix to given path/file.
+    A path ending in .npz is written as a binary NumPy archive, anything else as OpenCV YAML/XML.
+    """
+    if path.endswith('.npz'):
+        np.savez(path, K=mtx, D=dist, H=H)
+        return
+    # Matrices are stored as base64 binary, exact and more compact than decimal text
+    cv_file = cv2.FileStorage(path, cv2.FILE_STORAGE_WRITE | cv2.FILE_STORAGE_WRITE_BASE64)
     cv_file.write("K", mtx)
     cv_file.write("D", dist)
     cv_file.write("H", H)
@@ -115,12 +192,16 @@ def load_coefficients(path):
     Load camera matrix (K) and distortion coefficients (D) from a file.
 
     Parameters:
-    - path (str): Path to the file containing camera calibration coefficients.
+    - path (str): Path to the file containing camera calibration coefficients (.npz, or YAML/XML).
 
     Returns:
     - mtx (numpy.ndarray): Camera matrix (intrinsic parameters).
     - dist (numpy.ndarray): Distortion coefficients.
     """
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return data['K'], data['D'], data['H']
+
     cv_file = cv2.FileStorage(path, cv2.FILE_STORAGE_READ)
     mtx = cv_file.getNode("K").mat()
     dist = cv_file.getNode("D").mat()
@@ -130,21 +211,60 @@ def load_coefficients(path):
     return mtx, dist, H
 
 
-def undistort_image(img, mtx, dist):
+def make_undistort_maps(mtx, dist, size, m1type=cv2.CV_16SC2):
     """
-    Load the coefficients, undistort and warp the input image.
+    Build the remap tables that undistort images of the given size.
     
     Parameters:
-    - img_path: Path to the image to be undistorted and warped.
-    - calibration_file: Path to the YML file with calibration matrices.
+    - mtx (numpy.ndarray): Camera matrix (intrinsic parameters).
+    - dist (numpy.ndarray): Distortion coefficients.
+    - size (tuple): Size (width, height) of the images.
+    - m1type (int): Type of the first map, cv2.CV_16SC2 (fixed-point) or cv2.CV_32FC1.
+    
+    Returns:
+    - map1, map2 (numpy.ndarray): Maps to pass to cv2.remap.
+    """
+    return cv2.initUndistortRectifyMap(mtx, dist, None, mtx, size, m1type)
+
+
+def undistort_image(img, mtx, dist, maps=None):
+    """
+    Undistort the input image.
+    
+    Parameters:
+    - img (numpy.ndarray): Image to be undistorted.
+    - mtx (numpy.ndarray): Camera matrix (intrinsic parameters).
+    - dist (numpy.ndarray): Distortion coefficients.
+    - maps (tuple): Maps from make_undistort_maps, built for this image if not given.
     
     Returns:
     - undistorted_img: Undistorted image.
     """
-    undistorted_img = cv2.undistort(img, mtx, dist)
+    if maps is None:
+        maps = make_undistort_maps(mtx, dist, img.shape[1::-1])
+    map1, map2 = maps
+    undistorted_img = cv2.remap(img, map1, map2, cv2.INTER_LINEAR)
     return undistorted_img
 
 
+def points_to_world(pts_xy, H):
+    """
+    Transform an array of points from image coordinates to world coordinates using a given homography matrix.
+    
+    Parameters:
+    - pts_xy (numpy.ndarray): Image points as an (N, 2) float32 or float64 array.
+    - H (numpy.ndarray): Homography matrix.
+    
+    Returns:
+    - world_pts (numpy.ndarray): Transformed points in world coordinates as an (N, 2) array.
+    """
+    pts_xy = np.asarray(pts_xy)
+    if pts_xy.dtype not in (np.float32, np.float64):
+        pts_xy = pts_xy.astype(np.float64)
+    world_pts = cv2.perspectiveTransform(pts_xy.reshape(-1, 1, 2), H)
+    return world_pts.reshape(-1, 2)
+
+
 def point_coordinates_to_world_coordinates(img_point, H):
     """
     Transform a point from image coordinates to world coordinates using a given homography matrix.
@@ -156,37 +276,25 @@ def point_coordinates_to_world_coordinates(img_point, H):
     Returns:
     - world_point (list): Transformed point in world coordinates in the format [X, Y].
     """
-    # Convert point to homogeneous coordinates
-    img_point_homogeneous = np.array([img_point[0], img_point[1], 1])
-    
-    # Use the homography matrix to get world coordinates in homogeneous form
-    world_point_homogeneous = np.dot(H, img_point_homogeneous)
-    
-    # Convert back from homogeneous coordinates to 2D
-    world_point = world_point_homogeneous[:2] / world_point_homogeneous[2]
-    
-    return world_point.tolist()
+    p = np.array([[[img_point[0], img_point[1]]]], dtype=np.float64)
+    return cv2.perspectiveTransform(p, H)[0, 0].tolist()
 
 
 
 def generate_aruco_markers(num_markers=4, marker_size=100):
-    # Get the ArUco dictionary
-    aruco_dict = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_50)
-    
-    for i in range(num_markers):
-        # Generate the marker
-        img = cv2.aruco.generateImageMarker(aruco_dict, i, marker_size)
-        cv2.imwrite(f'aruco_marker_{i}.jpg', img)
+    # Generate the markers
+    images = [cv2.aruco.generateImageMarker(_ARUCO_DICT, i, marker_size) for i in range(num_markers)]
+
+    # Encode and write them concurrently, imwrite releases the GIL
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(lambda ix: cv2.imwrite(f'aruco_marker_{ix[0]}.jpg', ix[1]), enumerate(images)))
 
 
 def detect_aruco_corners(image_path):
-    image = cv2.imread(image_path)
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    aruco_dict = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_50)
-    parameters = cv2.aruco.DetectorParameters_create()
-    corners, ids, rejectedImgPoints = cv2.aruco.detectMarkers(gray, aruco_dict, parameters=parameters)
+    gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    corners, ids, rejectedImgPoints = _ARUCO_DETECTOR.detectMarkers(gray)
     
-    top_left_corners = [c[0][0] for c in corners] # Extracting the top-left corner of each marker
+    top_left_corners = np.array([c[0, 0] for c in corners], dtype=np.float32) # Extracting the top-left corner of each marker
     return top_left_corners, ids
 
 def find_homography_from_aruco(image_path, real_world_positions):
@@ -214,26 +322,204 @@ def warp_image(image, H, width, height):
     return corrected_image
 
 
-def preprocess_image(img, mtx, dist, H,  width=640, height=480):
+def make_preprocess_maps(mtx, dist, H, src_size, width=640, height=480, m1type=cv2.CV_16SC2):
+    """
+    Build remap tables that undistort and warp an image in a single pass.
+    
+    Parameters:
+    - mtx (numpy.ndarray): Camera matrix (intrinsic parameters).
+    - dist (numpy.ndarray): Distortion coefficients.
+    - H (numpy.ndarray): Homography matrix.
+    - src_size (tuple): Size (width, height) of the source images.
+    - width (int): Width of the warped image.
+    - height (int): Height of the warped image.
+    - m1type (int): Type of the first map, cv2.CV_16SC2 (fixed-point) or cv2.CV_32FC1.
+    
+    Returns:
+    - map1 (numpy.ndarray): Fixed-point (CV_16SC2) source coordinates of each warped pixel,
+      or their x coordinates (CV_32FC1).
+    - map2 (numpy.ndarray): Interpolation table indices (CV_16UC1) of each warped pixel,
+      or their y coordinates (CV_32FC1).
+    """
+    src_w, src_h = src_size
+    # Float maps, so they can be sampled at the non-integer positions given by the homography
+    mapx, mapy = make_undistort_maps(mtx, dist, (src_w, src_h), cv2.CV_32FC1)
+
+    # Position in the undistorted image of every pixel of the warped image
+    X, Y = np.meshgrid(np.arange(width, dtype=np.float64), np.arange(height, dtype=np.float64))
+    H_inv = np.linalg.inv(H)
+    und_x = H_inv[0, 0]*X + H_inv[0, 1]*Y + H_inv[0, 2]
+    und_y = H_inv[1, 0]*X + H_inv[1, 1]*Y + H_inv[1, 2]
+    und_w = H_inv[2, 0]*X + H_inv[2, 1]*Y + H_inv[2, 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        und_x = np.where(und_w > 0, und_x / und_w, -1).astype(np.float32)
+        und_y = np.where(und_w > 0, und_y / und_w, -1).astype(np.float32)
+
+    # Sample the undistortion maps there to get the position in the distorted source image
+    mapx_fused = cv2.remap(mapx, und_x, und_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+    mapy_fused = cv2.remap(mapy, und_x, und_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+    # Pixels falling outside the undistorted image stay black, as with warpPerspective
+    outside = (und_x < 0) | (und_x > src_w - 1) | (und_y < 0) | (und_y > src_h - 1)
+    mapx_fused[outside] = -1
+    mapy_fused[outside] = -1
+    if m1type == cv2.CV_32FC1:
+        return mapx_fused, mapy_fused
+
+    # Fixed-point maps halve the memory read per pixel and use the faster remap kernels
+    map1, map2 = cv2.convertMaps(mapx_fused, mapy_fused, cv2.CV_16SC2)
+    return map1, map2
+
+
+def preprocess_image(img, mtx, dist, H,  width=640, height=480, maps=None):
+    """
+    Undistort and warp the input image in a single remap, with one interpolation.
+    
+    Parameters:
+    - img (str or numpy.ndarray): Path to the image or the image itself.
+    - mtx (numpy.ndarray): Camera matrix (intrinsic parameters).
+    - dist (numpy.ndarray): Distortion coefficients.
+    - H (numpy.ndarray): Homography matrix.
+    - width (int): Width of the warped image.
+    - height (int): Height of the warped image.
+    - maps (tuple): Maps from make_preprocess_maps, built for this image if not given.
+    
+    Returns:
+    - warped_image: Undistorted and warped image.
+    """
     if isinstance(img, str):
         img = cv2.imread(img)
-    undistorted_image= undistort_image(img, mtx, dist)
-    warped_image= warp_image(undistorted_image, H, width, height)
+    if maps is None:
+        maps = make_preprocess_maps(mtx, dist, H, img.shape[1::-1], width, height)
+    map1, map2 = maps
+    warped_image = cv2.remap(img, map1, map2, cv2.INTER_LINEAR)
     return warped_image
 
 
-def batch_preprocess_images(input_folder, output_folder, calibration_path, width=640, height=480):
+def _batch_preprocess_cuda(jobs, mtx, dist, H, width=640, height=480):
+    # Two slots with their own stream and buffers, so that the transfers of
+    # one image overlap with the remap of the previous one
+    slots = [(cv2.cuda.Stream(), cv2.cuda_GpuMat(), cv2.cuda_GpuMat()) for _ in range(2)]
+    pending = [None, None]
+    gpu_maps = {}
+
+    def flush(slot):
+        stream = slots[slot][0]
+        stream.waitForCompletion()
+        preprocessed_image, output_path = pending[slot]
+        cv2.imwrite(output_path, preprocessed_image)
+        print(f'Processed image saved to {output_path}')
+        pending[slot] = None
+
+    for i, (image_path, output_path) in enumerate(jobs):
+        slot = i % 2
+        if pending[slot] is not None:
+            flush(slot)
+        img = cv2.imread(image_path)
+        if img is None:
+            print(f'Could not read image {image_path}')
+            continue
+        size = img.shape[1::-1]
+        if size not in gpu_maps:
+            # cv2.cuda.remap only accepts float maps
+            mapx, mapy = make_preprocess_maps(mtx, dist, H, size, width, height, cv2.CV_32FC1)
+            g_map1, g_map2 = cv2.cuda_GpuMat(), cv2.cuda_GpuMat()
+            g_map1.upload(mapx)
+            g_map2.upload(mapy)
+            gpu_maps[size] = (g_map1, g_map2)
+        g_map1, g_map2 = gpu_maps[size]
+
+        stream, g_src, g_dst = slots[slot]
+        g_src.upload(img, stream)
+        g_dst = cv2.cuda.remap(g_src, g_map1, g_map2, cv2.INTER_LINEAR, dst=g_dst, stream=stream)
+        pending[slot] = (g_dst.download(stream), output_path)
+
+    for slot in range(2):
+        if pending[slot] is not None:
+            flush(slot)
+
+
+def _process_one(state, job):
+    """
+    Undistort and warp one image of a batch and write it.
+    
+    Parameters:
+    - state (dict): Calibration (mtx, dist, H), output size (width, height) and remap tables
+      by source image size (maps); tables for new sizes are added to it.
+    - job (tuple): Paths (image_path, output_path).
+    
+    Returns:
+    - output_path (str): Path of the written image, None if the image cannot be read.
+    """
+    image_path, output_path = job
+    img = cv2.imread(image_path)
+    if img is None:
+        return None
+    size = img.shape[1::-1]
+    if size not in state['maps']:
+        state['maps'][size] = make_preprocess_maps(state['mtx'], state['dist'], state['H'], size, state['width'], state['height'])
+    preprocessed_image = preprocess_image(img, state['mtx'], state['dist'], state['H'], state['width'], state['height'], state['maps'][size])
+    cv2.imwrite(output_path, preprocessed_image)
+    return output_path
+
+
+# State of the batch handled by this worker process, set once by _init_worker
+_worker_state = {}
+
+def _init_worker(state):
+    _worker_state.update(state)
+    # The pool already uses every core, do not start an OpenCV thread pool in each worker
+    cv2.setNumThreads(1)
+
+
+def _process_in_worker(job):
+    return _process_one(_worker_state, job)
+
+
+def batch_preprocess_images(input_folder, output_folder, calibration_path, width=640, height=480, use_threads=False, use_cuda=False):
     mtx, dist, H = load_coefficients(calibration_path)
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    for filename in os.listdir(input_folder):
-        if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff')):
-            image_path = os.path.join(input_folder, filename)
-            preprocessed_image = preprocess_image(image_path, mtx, dist, H, width, height)
-            output_path = os.path.join(output_folder, filename)
-            cv2.imwrite(output_path, preprocessed_image)
-            print(f'Processed image saved to {output_path}')
+    with os.scandir(input_folder) as entries:
+        jobs = [(entry.path, os.path.join(output_folder, entry.name))
+                for entry in entries
+                if entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file()]
+    if not jobs:
+        return
+
+    if use_cuda and cv2.cuda.getCudaEnabledDeviceCount() > 0:
+        _batch_preprocess_cuda(jobs, mtx, dist, H, width, height)
+        return
+
+    # The first readable image is processed here, which builds the remap tables for its
+    # size before they are sent to every worker; other sizes are built by the workers as needed
+    state = dict(mtx=mtx, dist=dist, H=H, width=width, height=height, maps={})
+    while jobs:
+        job = jobs.pop(0)
+        output_path = _process_one(state, job)
+        if output_path is None:
+            print(f'Could not read image {job[0]}')
+            continue
+        print(f'Processed image saved to {output_path}')
+        break
+    if not jobs:
+        return
+
+    # Images are independent, a process pool scales decode and encode with the
+    # number of cores; threads are enough when the batch is bound by the disk
+    if use_threads:
+        executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        process = functools.partial(_process_one, state)
+    else:
+        executor = ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker, initargs=(state,))
+        process = _process_in_worker
+    with executor:
+        for job, output_path in zip(jobs, executor.map(process, jobs, chunksize=8)):
+            if output_path is None:
+                print(f'Could not read image {job[0]}')
+            else:
+                print(f'Processed image saved to {output_path}')
 
 def main():
     parser = argparse.ArgumentParser(description='Camera Calibration')
@@ -243,6 +529,8 @@ def main():
     parser.add_argument('--square_size', type=float, default=25, help='Size of an edge of the square of the checkerboard in millimeters')
     parser.add_argument('--width', type=int, default=10, help='Number of inner corners along the width')
     parser.add_argument('--height', type=int, default=7, help='Number of inner corners along the height')
+    parser.add_argument('--sb', action='store_true', help='Detect the checkerboard corners with findChessboardCornersSB (slower, more robust)')
+    parser.add_argument('--draw', action='store_true', help='Display the detected corners on each calibration image')
     parser.add_argument('--save_to', type=str, default='./calibration.yml', help='Path to where to save the calibration')
 
     args = parser.parse_args()
@@ -257,7 +545,7 @@ def main():
     ref_plan_path = args.ref_plan_path 
     square_size = args.square_size
 
-    ret, mtx, dist, rvecs, tvecs = calibrate(dirpath, image_format, width, height)
+    ret, mtx, dist, rvecs, tvecs = calibrate(dirpath, image_format, width, height, args.sb, args.draw)
     H, _ = find_homography_from_checkerboad(ref_plan_path, mtx, dist, width, height, square_size)
     save_coefficients(mtx, dist, H, path)
     print(f"RMS re-projection error: {ret}")